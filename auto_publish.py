@@ -1,17 +1,29 @@
 #!/usr/bin/env python3
 """
-Auto-publish script: uploads task directories to HuggingFace every 30 minutes.
+Auto-publish script: uploads task directories to HuggingFace as they appear.
 
 Finds all task directories (containing workspace.yaml) under the output dir,
 and uploads the ENTIRE directory tree including tests/ subdirectory to HF.
-Uses huggingface_hub for reliable uploads with proper batching.
+Uses huggingface_hub for reliable uploads with proper batching. The output dir
+is polled every PUBLISH_POLL_INTERVAL seconds; every task whose files have not
+changed for PUBLISH_SETTLE_SECONDS is committed, several tasks per commit.
+Uploads run on a background thread pool so discovery never waits on them, and
+tasks that fail to upload are retried with exponential backoff capped at
+PUBLISH_RETRY_MAX_BACKOFF. The legacy PUBLISH_INTERVAL is read as the poll
+interval when PUBLISH_POLL_INTERVAL is not set.
 """
 
+import fnmatch
+import json
 import os
+import re
 import sys
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 from huggingface_hub import HfApi, CommitOperationAdd
 
@@ -26,93 +38,322 @@ HF_TOKEN = os.environ.get("HF_TOKEN", "")
 HF_REPO = os.environ.get("HF_REPO", "CortexLM/swe-forge")
 OUTPUT_DIR = os.environ.get("OUTPUT_DIR", "generated-swe")
 UPLOADED_MARKER = ".hf_uploaded"
-INTERVAL = int(os.environ.get("PUBLISH_INTERVAL", "1800"))  # 30 minutes
+LEGACY_INTERVAL = os.environ.get("PUBLISH_INTERVAL")  # pre-polling name for the publish cadence
+POLL_INTERVAL = int(os.environ.get("PUBLISH_POLL_INTERVAL", LEGACY_INTERVAL or "60"))  # discovery cadence
+SETTLE_SECONDS = int(os.environ.get("PUBLISH_SETTLE_SECONDS", "60"))  # quiet time before upload
+RETRY_MAX_BACKOFF = int(os.environ.get("PUBLISH_RETRY_MAX_BACKOFF", "1800"))  # failed-task retry cap (30 min)
+WORKERS = int(os.environ.get("PUBLISH_WORKERS", "8"))  # concurrent commits
+BATCH_TASKS = int(os.environ.get("PUBLISH_BATCH_TASKS", "20"))  # max tasks per commit
+BATCH_BYTES = int(os.environ.get("PUBLISH_BATCH_BYTES", str(500 * 1024 * 1024)))  # max bytes per commit
+PREUPLOAD_THREADS = int(os.environ.get("PUBLISH_PREUPLOAD_THREADS", "5"))  # LFS threads per commit
+IGNORE = [p for p in os.environ.get("PUBLISH_IGNORE", "__pycache__,*.pyc,.git,.venv,node_modules").split(",") if p]
+IGNORE_RE = re.compile("|".join(fnmatch.translate(p) for p in IGNORE) or "(?!)")  # "(?!)" never matches
+VERIFY = os.environ.get("PUBLISH_VERIFY", "") not in ("", "0", "false")  # re-check manifests at startup
+
+# Task ids known to be on HF; seeded from markers at startup, updated after each upload
+UPLOADED: set[str] = set()
+# Task ids submitted to the upload pool but not finished yet (set ops are atomic under the GIL)
+IN_FLIGHT: set[str] = set()
+# Task ids whose last upload failed -> (consecutive failures, monotonic time of next retry)
+FAILED: dict[str, tuple[int, float]] = {}
 
 
 def find_task_dirs(base_dir: str) -> list[Path]:
-    """Find all directories containing workspace.yaml (task directories)."""
+    """Find all directories containing workspace.yaml (task directories).
+
+    Tasks don't nest, so the walk never descends into a task directory; this
+    keeps the cost proportional to the number of tasks rather than their files.
+    """
     tasks = []
-    for ws in Path(base_dir).rglob("workspace.yaml"):
-        tasks.append(ws.parent)
+    stack = [base_dir]
+    while stack:
+        d = stack.pop()
+        if os.path.isfile(os.path.join(d, "workspace.yaml")):
+            tasks.append(Path(d))
+            continue
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+        except OSError as e:
+            log.warning(f"Could not scan {d}: {e}")
     return tasks
 
 
-def collect_files_for_upload(task_dir: Path, repo_prefix: str) -> list[tuple[str, Path]]:
-    """Collect all files in a task directory for upload, including tests/ subdirectory."""
-    files = []
-    for filepath in task_dir.rglob("*"):
-        if filepath.is_file() and filepath.name != UPLOADED_MARKER:
-            rel = filepath.relative_to(task_dir)
-            repo_path = f"{repo_prefix}/{rel}"
-            files.append((repo_path, filepath))
-    return files
+def _scandir_recursive(path: str, prefix: str = ""):
+    """Yield (rel_path, DirEntry) for every file under path, skipping upload markers
+    and any entry whose name matches PUBLISH_IGNORE.
 
+    Uses the cached DirEntry type information so each entry costs a single syscall.
+    """
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.name == UPLOADED_MARKER or IGNORE_RE.match(entry.name):
+                continue
+            rel = prefix + "/" + entry.name if prefix else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                yield from _scandir_recursive(entry.path, rel)
+            elif entry.is_file(follow_symlinks=False):
+                yield rel, entry
 
-def upload_tasks(api: HfApi):
-    """Find and upload all new task directories to HuggingFace."""
-    if not os.path.isdir(OUTPUT_DIR):
-        log.info(f"Output directory not found yet: {OUTPUT_DIR}")
-        return
 
-    task_dirs = find_task_dirs(OUTPUT_DIR)
-    if not task_dirs:
-        log.info("No task directories found yet")
-        return
+def task_id_for(task_dir: Path) -> str:
+    """Return the task id (POSIX path relative to OUTPUT_DIR) for a task directory."""
+    return str(task_dir.relative_to(OUTPUT_DIR)).replace(os.sep, "/")
 
-    new_tasks = [d for d in task_dirs if not (d / UPLOADED_MARKER).exists()]
-    if not new_tasks:
-        log.info(f"All {len(task_dirs)} tasks already uploaded")
-        return
 
-    log.info(f"Found {len(new_tasks)} new tasks to upload (total: {len(task_dirs)})")
+def write_manifest(task_dir: Path, file_count: int, total_bytes: int):
+    """Write the upload marker, recording what was uploaded as a small JSON manifest."""
+    manifest = {"files": file_count, "bytes": total_bytes, "ts": int(time.time())}
+    (task_dir / UPLOADED_MARKER).write_text(json.dumps(manifest))
 
-    for task_dir in new_tasks:
-        try:
-            rel = task_dir.relative_to(OUTPUT_DIR)
-            task_id = str(rel).replace(os.sep, "/")
-            repo_prefix = f"tasks/{task_id}"
 
-            file_pairs = collect_files_for_upload(task_dir, repo_prefix)
-            if not file_pairs:
-                log.warning(f"No files found in task dir: {task_dir}")
-                continue
+def manifest_matches(task_dir: Path) -> bool:
+    """Check that a task dir still holds the number of files and bytes its manifest recorded.
 
-            has_tests_dir = any("tests/" in rp for rp, _ in file_pairs)
-            test_file_count = sum(1 for rp, _ in file_pairs if "tests/" in rp)
+    Markers written before manifests existed are empty and are trusted as-is. Any
+    I/O error counts as a mismatch, so the task is re-uploaded rather than aborting
+    startup.
+    """
+    try:
+        manifest = json.loads((task_dir / UPLOADED_MARKER).read_text() or "{}")
+    except (OSError, ValueError):
+        return False
+    if "files" not in manifest:
+        return True
+    file_count = 0
+    total_bytes = 0
+    try:
+        for _, entry in _scandir_recursive(str(task_dir)):
+            file_count += 1
+            total_bytes += entry.stat(follow_symlinks=False).st_size
+    except OSError as e:
+        log.warning(f"Could not verify {task_dir}: {e}")
+        return False
+    return file_count == manifest["files"] and total_bytes == manifest.get("bytes")
 
-            log.info(
-                f"Uploading task {task_id}: {len(file_pairs)} files "
-                f"(tests/ dir: {'yes' if has_tests_dir else 'NO'}, "
-                f"test files: {test_file_count})"
-            )
 
-            operations = []
-            for repo_path, local_path in file_pairs:
-                operations.append(
-                    CommitOperationAdd(
-                        path_in_repo=repo_path,
-                        path_or_fileobj=str(local_path),
-                    )
-                )
+def load_uploaded_tasks():
+    """Seed UPLOADED from the marker files left by previous runs.
 
-            # Batch upload all files in a single commit
-            api.create_commit(
-                repo_id=HF_REPO,
-                repo_type="dataset",
-                operations=operations,
-                commit_message=f"Add task {task_id} ({len(file_pairs)} files, {test_file_count} test files)",
+    The task trees themselves are only walked when PUBLISH_VERIFY is set, in which
+    case tasks whose file count no longer matches their manifest are re-uploaded.
+    """
+    if not os.path.isdir(OUTPUT_DIR):
+        return
+    for task_dir in find_task_dirs(OUTPUT_DIR):
+        if not (task_dir / UPLOADED_MARKER).exists():
+            continue
+        if VERIFY and not manifest_matches(task_dir):
+            log.warning(f"Task changed since upload, will re-upload: {task_dir}")
+            continue
+        UPLOADED.add(task_id_for(task_dir))
+    log.info(f"Found {len(UPLOADED)} previously uploaded tasks")
+
+
+def collect_files_for_upload(
+    task_dir: Path, repo_prefix: str
+) -> tuple[list[tuple[str, str]], int, int, float]:
+    """Collect (repo_path, local_path) string pairs for all files in a task directory,
+    including tests/ subdirectory. Repo paths always use forward slashes.
+
+    Returns the pairs along with the number of files under tests/, the total size
+    and the newest mtime among the files.
+    """
+    repo_prefix += "/"
+    files = []
+    test_file_count = 0
+    total_bytes = 0
+    newest_mtime = 0.0
+    for rel, entry in _scandir_recursive(str(task_dir)):
+        if rel.startswith("tests/"):
+            test_file_count += 1
+        st = entry.stat(follow_symlinks=False)
+        total_bytes += st.st_size
+        newest_mtime = max(newest_mtime, st.st_mtime)
+        files.append((repo_prefix + rel, entry.path))
+    return files, test_file_count, total_bytes, newest_mtime
+
+
+@dataclass
+class PendingTask:
+    """A task directory whose files have been collected and are ready to commit."""
+    task_id: str
+    task_dir: Path
+    file_pairs: list[tuple[str, str]]
+    test_file_count: int
+    total_bytes: int
+
+
+def prepare_task(task_dir: Path) -> Optional[PendingTask]:
+    """Collect the files of a task directory.
+
+    Returns None if there is nothing to upload, or if the task is still being written
+    (the pipeline creates workspace.yaml before tests/, so a task is only uploaded
+    once neither its files nor its directory have changed for SETTLE_SECONDS).
+    """
+    task_id = task_id_for(task_dir)
+    repo_prefix = f"tasks/{task_id}"
+
+    file_pairs, test_file_count, total_bytes, newest_mtime = collect_files_for_upload(task_dir, repo_prefix)
+    if not file_pairs:
+        log.warning(f"No files found in task dir: {task_dir}")
+        return None
+
+    newest_mtime = max(newest_mtime, os.stat(task_dir).st_mtime)
+    if time.time() - newest_mtime < SETTLE_SECONDS:
+        log.debug(f"Task {task_id} is still being written, skipping for now")
+        return None
+
+    log.info(
+        f"Prepared task {task_id}: {len(file_pairs)} files, {total_bytes} bytes "
+        f"(tests/ dir: {'yes' if test_file_count else 'NO'}, "
+        f"test files: {test_file_count})"
+    )
+    return PendingTask(task_id, task_dir, file_pairs, test_file_count, total_bytes)
+
+
+def batch_tasks(tasks: list[PendingTask]) -> list[list[PendingTask]]:
+    """Group tasks into batches bounded by BATCH_TASKS and BATCH_BYTES."""
+    batches = []
+    current: list[PendingTask] = []
+    current_bytes = 0
+    for task in tasks:
+        if current and (len(current) >= BATCH_TASKS or current_bytes + task.total_bytes > BATCH_BYTES):
+            batches.append(current)
+            current, current_bytes = [], 0
+        current.append(task)
+        current_bytes += task.total_bytes
+    if current:
+        batches.append(current)
+    return batches
+
+
+def commit_tasks(api: HfApi, tasks: list[PendingTask]):
+    """Upload one or more tasks in a single commit, then mark them as uploaded."""
+    operations = []
+    for task in tasks:
+        for repo_path, local_path in task.file_pairs:
+            operations.append(
+                CommitOperationAdd(
+                    path_in_repo=repo_path,
+                    path_or_fileobj=local_path,
+                )
             )
 
-            # Mark as uploaded
-            (task_dir / UPLOADED_MARKER).touch()
-            log.info(f"Successfully uploaded task: {task_id}")
+    file_count = sum(len(t.file_pairs) for t in tasks)
+    test_file_count = sum(t.test_file_count for t in tasks)
+    if len(tasks) == 1:
+        commit_message = f"Add task {tasks[0].task_id} ({file_count} files, {test_file_count} test files)"
+    else:
+        commit_message = f"Add {len(tasks)} tasks ({file_count} files, {test_file_count} test files)"
+
+    # create_commit preuploads LFS blobs itself, on num_threads threads
+    api.create_commit(
+        repo_id=HF_REPO,
+        repo_type="dataset",
+        operations=operations,
+        commit_message=commit_message,
+        num_threads=PREUPLOAD_THREADS,
+    )
+
+    # Only mark once the commit has landed, so a failed batch is retried later
+    for task in tasks:
+        write_manifest(task.task_dir, len(task.file_pairs), task.total_bytes)
+        UPLOADED.add(task.task_id)
+        FAILED.pop(task.task_id, None)
+        log.info(f"Successfully uploaded task: {task.task_id}")
+
+
+def record_failure(task_id: str):
+    """Back off retries of a failed task: POLL_INTERVAL, doubling up to RETRY_MAX_BACKOFF."""
+    failures = FAILED.get(task_id, (0, 0.0))[0] + 1
+    delay = min(POLL_INTERVAL * 2 ** (failures - 1), RETRY_MAX_BACKOFF)
+    FAILED[task_id] = (failures, time.monotonic() + delay)
+    log.info(f"Will retry task {task_id} in {delay}s (failure #{failures})")
+
+
+def upload_batch(api: HfApi, batch: list[PendingTask]):
+    """Commit a batch of tasks, falling back to per-task commits if the batch fails."""
+    try:
+        try:
+            commit_tasks(api, batch)
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                log.error(f"Failed to upload task {batch[0].task_dir}: {e}")
+                record_failure(batch[0].task_id)
+                return
+            log.warning(f"Batch commit of {len(batch)} tasks failed, retrying individually: {e}")
+
+        for task in batch:
+            try:
+                commit_tasks(api, [task])
+            except Exception as e:
+                log.error(f"Failed to upload task {task.task_dir}: {e}")
+                record_failure(task.task_id)
+    finally:
+        for task in batch:
+            IN_FLIGHT.discard(task.task_id)
+
+
+def upload_tasks(api: HfApi, pool: ThreadPoolExecutor) -> bool:
+    """Find new, settled task directories and submit them to the upload pool.
+
+    Tasks that recently failed are skipped until their backoff expires.
+    Returns True if any upload was submitted.
+    """
+    if not os.path.isdir(OUTPUT_DIR):
+        log.debug(f"Output directory not found yet: {OUTPUT_DIR}")
+        return False
+
+    task_dirs = find_task_dirs(OUTPUT_DIR)
+    if not task_dirs:
+        log.debug("No task directories found yet")
+        return False
+
+    now = time.monotonic()
+    new_tasks = []
+    for d in task_dirs:
+        task_id = task_id_for(d)
+        if task_id in UPLOADED or task_id in IN_FLIGHT:
+            continue
+        if task_id in FAILED and FAILED[task_id][1] > now:
+            continue
+        new_tasks.append(d)
+    if not new_tasks:
+        log.debug(f"No tasks due for upload ({len(task_dirs)} total)")
+        return False
 
+    pending = []
+    for task_dir in new_tasks:
+        try:
+            task = prepare_task(task_dir)
         except Exception as e:
-            log.error(f"Failed to upload task {task_dir}: {e}")
+            log.error(f"Failed to collect task {task_dir}: {e}")
+            record_failure(task_id_for(task_dir))
             continue
+        if task is not None:
+            pending.append(task)
+    if not pending:
+        return False
 
-    uploaded = sum(1 for d in task_dirs if (d / UPLOADED_MARKER).exists())
-    log.info(f"Upload status: {uploaded}/{len(task_dirs)} tasks uploaded to HF")
+    log.info(f"Found {len(pending)} new tasks to upload (total: {len(task_dirs)})")
+    batches = batch_tasks(pending)
+    log.info(f"Committing {len(pending)} tasks in {len(batches)} commits")
+
+    for batch in batches:
+        for task in batch:
+            IN_FLIGHT.add(task.task_id)
+        pool.submit(upload_batch, api, batch)
+
+    uploaded = sum(1 for d in task_dirs if task_id_for(d) in UPLOADED)
+    log.info(
+        f"Upload status: {uploaded}/{len(task_dirs)} tasks uploaded to HF, "
+        f"{len(IN_FLIGHT)} in flight"
+    )
+    return bool(batches)
 
 
 def main():
@@ -123,7 +364,16 @@ def main():
     log.info(f"Auto-publish started")
     log.info(f"  HF repo: {HF_REPO}")
     log.info(f"  Output dir: {OUTPUT_DIR}")
-    log.info(f"  Interval: {INTERVAL}s ({INTERVAL // 60} min)")
+    log.info(f"  Poll interval: {POLL_INTERVAL}s (settle time: {SETTLE_SECONDS}s)")
+    log.info(f"  Max retry backoff: {RETRY_MAX_BACKOFF}s ({RETRY_MAX_BACKOFF // 60} min)")
+    if LEGACY_INTERVAL is not None:
+        log.warning(
+            "PUBLISH_INTERVAL is deprecated: tasks are now published on every poll. "
+            + ("It is ignored because PUBLISH_POLL_INTERVAL is set."
+               if "PUBLISH_POLL_INTERVAL" in os.environ
+               else "Using it as PUBLISH_POLL_INTERVAL; set that instead.")
+        )
+    log.info(f"  Workers: {WORKERS}")
 
     api = HfApi(token=HF_TOKEN)
 
@@ -138,14 +388,16 @@ def main():
         except Exception as e:
             log.warning(f"Could not create repo (may already exist): {e}")
 
-    while True:
-        try:
-            upload_tasks(api)
-        except Exception as e:
-            log.error(f"Upload cycle failed: {e}")
+    load_uploaded_tasks()
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        while True:
+            try:
+                upload_tasks(api, pool)
+            except Exception as e:
+                log.error(f"Upload cycle failed: {e}")
 
-        log.info(f"Sleeping {INTERVAL}s until next publish cycle...")
-        time.sleep(INTERVAL)
+            time.sleep(POLL_INTERVAL)
 
 
 if __name__ == "__main__":
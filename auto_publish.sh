@@ -1,5 +1,8 @@
 #!/bin/bash
-# Auto-publish script: uploads task directories to HuggingFace every 30 minutes
+# Legacy auto-publish script: uploads task directories to HuggingFace every 30 minutes,
+# one HTTP commit per file. run_generation.sh uses auto_publish.py instead, which polls
+# every PUBLISH_POLL_INTERVAL seconds (default 60), waits for each task to settle and
+# batches several tasks per commit.
 # The pipeline already uploads parquet shards in real-time.
 # This script handles uploading the task workspace directories (prompt.md, workspace.yaml, tests/)
 # that accumulate in generated-swe/ as tasks complete.
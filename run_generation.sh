@@ -1,6 +1,6 @@
 #!/bin/bash
 # Master launch script: starts SWE-forge mining pipeline + auto-publish to HuggingFace
-# Generates 30+ datasets and uploads them every 30 minutes
+# Generates 30+ datasets; auto_publish.py polls every minute and uploads finished tasks
 set -euo pipefail
 
 export OPENROUTER_API_KEY="${OPENROUTER_API_KEY:?Set OPENROUTER_API_KEY}"
@@ -54,7 +54,7 @@ echo "[$(date)] Mining pipeline started (PID: ${MINING_PID})"
 # Wait a moment for the pipeline to initialize
 sleep 5
 
-echo "[$(date)] Starting auto-publish to HuggingFace (every 30 min)..."
+echo "[$(date)] Starting auto-publish to HuggingFace (polls every ${PUBLISH_POLL_INTERVAL:-${PUBLISH_INTERVAL:-60}}s)..."
 nohup python3 auto_publish.py > auto_publish.log 2>&1 &
 PUBLISH_PID=$!
 echo "[$(date)] Auto-publish started (PID: ${PUBLISH_PID})"
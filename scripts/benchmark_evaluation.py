@@ -11,13 +11,37 @@ This script:
 
 import json
 import os
+import selectors
+import signal
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
+# orjson parses/serializes UTF-8 bytes directly; fall back to stdlib json when absent
+try:
+    import orjson
+
+    def json_loads(data: bytes):
+        return orjson.loads(data)
+
+    def json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    def json_loads(data: bytes):
+        return json.loads(data)
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
+    JSONDecodeError = json.JSONDecodeError
+
 
 @dataclass
 class TaskResult:
@@ -46,20 +70,102 @@ class EvaluationReport:
     recommendations: list = field(default_factory=list)
 
 
-def run_command(cmd: list[str], env: Optional[dict] = None) -> tuple[int, str, str]:
-    """Run a command and return (returncode, stdout, stderr)."""
+# Children run in their own session (so a timeout can kill everything they spawn),
+# which also shields them from the terminal's Ctrl-C. run_command usually runs on
+# worker threads, so the main thread must kill them via kill_running_commands().
+_procs_lock = threading.Lock()
+_running_procs: set[subprocess.Popen] = set()
+_stopping = False
+
+
+def _kill_process_group(proc: subprocess.Popen):
+    """Kill a child started with start_new_session=True along with anything it spawned."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    proc.wait()
+
+
+def kill_running_commands():
+    """Kill every command started by run_command and refuse to start new ones."""
+    global _stopping
+    with _procs_lock:
+        _stopping = True
+        procs = list(_running_procs)
+    for proc in procs:
+        _kill_process_group(proc)
+
+
+def run_command(
+    cmd: list[str],
+    env: Optional[dict] = None,
+    timeout: int = 1800,  # 30 minute timeout
+    stderr_limit: int = 64 * 1024,
+) -> tuple[int, bytearray, bytearray]:
+    """Run a command and return (returncode, stdout, stderr) as raw byte buffers.
+
+    stdout is collected incrementally; of stderr (cargo build and log output)
+    only the last `stderr_limit` bytes are kept. On timeout or any exception in
+    this thread the child's whole process group is killed; interrupts in other
+    threads must go through kill_running_commands().
+    """
     merged_env = os.environ.copy()
     if env:
         merged_env.update(env)
     
-    result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        env=merged_env,
-        timeout=1800  # 30 minute timeout
-    )
-    return result.returncode, result.stdout, result.stderr
+    with _procs_lock:
+        if _stopping:
+            raise RuntimeError(f"Not starting {cmd[0]}: shutting down")
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=merged_env,
+            start_new_session=True,
+        )
+        _running_procs.add(proc)
+    deadline = time.monotonic() + timeout
+    stdout = bytearray()
+    stderr_tail = bytearray()
+    
+    try:
+        with selectors.DefaultSelector() as sel:
+            sel.register(proc.stdout, selectors.EVENT_READ, stdout)
+            sel.register(proc.stderr, selectors.EVENT_READ, stderr_tail)
+            while sel.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired(cmd, timeout, output=stdout, stderr=stderr_tail)
+                for key, _ in sel.select(remaining):
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        sel.unregister(key.fileobj)
+                        continue
+                    key.data.extend(chunk)
+                    if key.data is stderr_tail and len(stderr_tail) > stderr_limit:
+                        del stderr_tail[:-stderr_limit]
+        returncode = proc.wait(timeout=max(deadline - time.monotonic(), 0))
+    except BaseException:
+        _kill_process_group(proc)
+        raise
+    finally:
+        with _procs_lock:
+            _running_procs.discard(proc)
+        proc.stdout.close()
+        proc.stderr.close()
+    
+    return returncode, stdout, stderr_tail
+
+
+# Generation and evaluation batches run concurrently; keep their output lines whole
+_print_lock = threading.Lock()
+
+
+def batch_print(label: str, message: str):
+    """Print a message prefixed with the batch it belongs to."""
+    with _print_lock:
+        print(f"[{label}] {message}")
 
 
 def generate_tasks(
@@ -89,25 +195,25 @@ def generate_tasks(
         # Generate tasks for specific category
         cmd.extend(["-c", categories[0]])
     
-    print(f"Generating {count} tasks...")
-    print(f"Command: {' '.join(cmd[:6])}...")
+    batch_print(output_dir, f"Generating {count} tasks...")
+    batch_print(output_dir, f"Command: {' '.join(cmd[:6])}...")
     
     returncode, stdout, stderr = run_command(cmd)
     
     if returncode != 0:
-        print(f"Error generating tasks: {stderr}")
+        batch_print(output_dir, f"Error generating tasks: {stderr.decode(errors='replace')}")
         return False
     
     try:
-        result = json.loads(stdout)
+        result = json_loads(stdout)
         if result.get("status") == "success":
-            print(f"Generated {len(result.get('tasks', []))} tasks")
+            batch_print(output_dir, f"Generated {len(result.get('tasks', []))} tasks")
             return True
         else:
-            print(f"Generation failed: {result}")
+            batch_print(output_dir, f"Generation failed: {result}")
             return False
-    except json.JSONDecodeError:
-        print(f"Could not parse output: {stdout[:500]}")
+    except JSONDecodeError:
+        batch_print(output_dir, f"Could not parse output: {stdout[:500].decode(errors='replace')}")
         return False
 
 
@@ -131,44 +237,59 @@ def evaluate_tasks(
         "--json",
     ]
     
-    print(f"Evaluating tasks in {tasks_dir}...")
+    batch_print(tasks_dir, "Evaluating tasks...")
     
     returncode, stdout, stderr = run_command(cmd, env={"RUST_LOG": "warn"})
     
     if returncode != 0:
-        print(f"Evaluation error: {stderr}")
+        batch_print(tasks_dir, f"Evaluation error: {stderr.decode(errors='replace')}")
         # Try to parse partial results
         
     try:
-        return json.loads(stdout)
-    except json.JSONDecodeError:
-        print(f"Could not parse evaluation output: {stdout[:500]}")
+        return json_loads(stdout)
+    except JSONDecodeError:
+        batch_print(tasks_dir, f"Could not parse evaluation output: {stdout[:500].decode(errors='replace')}")
         return None
 
 
+def abort_batches(pool: ThreadPoolExecutor):
+    """Cancel queued batches and kill running ones (e.g. on Ctrl-C).
+
+    Must run before the pool's `with` block exits, since its shutdown waits for
+    the worker threads and thus for their cargo subprocesses.
+    """
+    pool.shutdown(wait=False, cancel_futures=True)
+    kill_running_commands()
+
+
 def analyze_results(evaluation_result: dict) -> EvaluationReport:
     """Analyze evaluation results and generate recommendations."""
     
     task_results = evaluation_result.get("task_results", [])
     
-    successful = sum(1 for t in task_results if t.get("success", False))
-    failed = len(task_results) - successful
-    
-    # Analyze by difficulty
+    # Single pass: overall and per-difficulty counts plus duration sums
+    successful = 0
+    duration_sum = 0.0
     by_difficulty = {}
     for result in task_results:
+        success = result.get("success", False)
+        duration = result.get("duration_seconds", 0)
         diff = result.get("difficulty", "unknown")
-        if diff not in by_difficulty:
-            by_difficulty[diff] = {"total": 0, "success": 0, "durations": []}
-        by_difficulty[diff]["total"] += 1
-        if result.get("success", False):
-            by_difficulty[diff]["success"] += 1
-        by_difficulty[diff]["durations"].append(result.get("duration_seconds", 0))
+        stats = by_difficulty.get(diff)
+        if stats is None:
+            stats = by_difficulty[diff] = {"total": 0, "success": 0, "duration_sum": 0.0}
+        stats["total"] += 1
+        stats["duration_sum"] += duration
+        duration_sum += duration
+        if success:
+            stats["success"] += 1
+            successful += 1
+    failed = len(task_results) - successful
     
     # Calculate success rates per difficulty
-    for diff, stats in by_difficulty.items():
-        stats["success_rate"] = stats["success"] / stats["total"] if stats["total"] > 0 else 0
-        stats["avg_duration"] = sum(stats["durations"]) / len(stats["durations"]) if stats["durations"] else 0
+    for stats in by_difficulty.values():
+        stats["success_rate"] = stats["success"] / stats["total"]
+        stats["avg_duration"] = stats.pop("duration_sum") / stats["total"]
     
     # Generate recommendations
     recommendations = []
@@ -191,8 +312,7 @@ def analyze_results(evaluation_result: dict) -> EvaluationReport:
         elif diff.lower() == "hard" and stats["success_rate"] > 0.5:
             recommendations.append(f"Hard tasks are too easy (success rate: {stats['success_rate']:.0%})")
     
-    durations = [r.get("duration_seconds", 0) for r in task_results]
-    avg_duration = sum(durations) / len(durations) if durations else 0
+    avg_duration = duration_sum / len(task_results) if task_results else 0
     
     return EvaluationReport(
         total_tasks=len(task_results),
@@ -207,41 +327,52 @@ def analyze_results(evaluation_result: dict) -> EvaluationReport:
 
 
 def print_report(report: EvaluationReport):
-    """Print a formatted evaluation report."""
-    
-    print("\n" + "=" * 60)
-    print("BENCHMARK EVALUATION REPORT")
-    print("=" * 60)
-    
-    print(f"\n📊 Overall Results:")
-    print(f"  Total Tasks: {report.total_tasks}")
-    print(f"  Successful: {report.successful_tasks}")
-    print(f"  Failed: {report.failed_tasks}")
-    print(f"  Success Rate: {report.success_rate:.1%}")
-    print(f"  Average Duration: {report.average_duration:.1f}s")
-    
-    print(f"\n📈 Results by Difficulty:")
+    """Print a formatted evaluation report.
+
+    Lines are collected into a buffer and written to stdout in one call.
+    """
+    lines = []
+    w = lines.append
+    
+    w("\n" + "=" * 60)
+    w("BENCHMARK EVALUATION REPORT")
+    w("=" * 60)
+    
+    w(f"\n📊 Overall Results:")
+    w(f"  Total Tasks: {report.total_tasks}")
+    w(f"  Successful: {report.successful_tasks}")
+    w(f"  Failed: {report.failed_tasks}")
+    w(f"  Success Rate: {report.success_rate:.1%}")
+    w(f"  Average Duration: {report.average_duration:.1f}s")
+    
+    w(f"\n📈 Results by Difficulty:")
     for diff, stats in report.by_difficulty.items():
-        print(f"  {diff}:")
-        print(f"    Tasks: {stats['total']}")
-        print(f"    Success Rate: {stats['success_rate']:.1%}")
-        print(f"    Avg Duration: {stats['avg_duration']:.1f}s")
+        w(
+            f"  {diff}:\n"
+            f"    Tasks: {stats['total']}\n"
+            f"    Success Rate: {stats['success_rate']:.1%}\n"
+            f"    Avg Duration: {stats['avg_duration']:.1f}s"
+        )
     
-    print(f"\n🔧 Recommendations:")
+    w(f"\n🔧 Recommendations:")
     for rec in report.recommendations:
-        print(f"  • {rec}")
+        w(f"  • {rec}")
     
-    print(f"\n📋 Task Details:")
+    w(f"\n📋 Task Details:")
     for result in report.task_results:
-        status = "✅" if result.get("success", False) else "❌"
-        print(f"  {status} {result.get('task_id', 'unknown')}")
-        print(f"     Category: {result.get('category', 'unknown')}")
-        print(f"     Difficulty: {result.get('difficulty', 'unknown')}")
-        print(f"     Duration: {result.get('duration_seconds', 0):.1f}s")
-        if not result.get("success", False):
-            print(f"     Notes: {result.get('notes', 'N/A')[:100]}")
+        get = result.get
+        success = get("success", False)
+        w(
+            f"  {'✅' if success else '❌'} {get('task_id', 'unknown')}\n"
+            f"     Category: {get('category', 'unknown')}\n"
+            f"     Difficulty: {get('difficulty', 'unknown')}\n"
+            f"     Duration: {get('duration_seconds', 0):.1f}s"
+        )
+        if not success:
+            w(f"     Notes: {get('notes', 'N/A')[:100]}")
     
-    print("\n" + "=" * 60)
+    w("\n" + "=" * 60)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
@@ -269,23 +400,33 @@ def main():
     print("-" * 40)
     
     categories = ["debugging", "file-operations", "containers", "networking", "system-administration"]
+    batch_categories = categories[:2]  # Generate from 2 categories
+    count = TASK_COUNT // len(batch_categories)
     tasks_generated = 0
     
-    for i, category in enumerate(categories[:2]):  # Generate from 2 categories
-        count = TASK_COUNT // 2
-        cat_output = f"{OUTPUT_DIR}/batch-{i+1}"
-        
-        print(f"\nGenerating {count} {category} tasks...")
-        if generate_tasks(
-            count=count,
-            model=MODEL,
-            api_key=API_KEY,
-            output_dir=cat_output,
-            categories=[category]
-        ):
-            tasks_generated += count
-        else:
-            print(f"Warning: Failed to generate {category} tasks")
+    # Each batch is an independent cargo subprocess waiting on the LLM, so run them side by side
+    with ThreadPoolExecutor(max_workers=len(batch_categories)) as pool:
+        futures = {}
+        for i, category in enumerate(batch_categories):
+            batch_dir = f"{OUTPUT_DIR}/batch-{i+1}"
+            batch_print(batch_dir, f"Category: {category}")
+            futures[(category, batch_dir)] = pool.submit(
+                generate_tasks,
+                count=count,
+                model=MODEL,
+                api_key=API_KEY,
+                output_dir=batch_dir,
+                categories=[category],
+            )
+        try:
+            for (category, batch_dir), future in futures.items():
+                if future.result():
+                    tasks_generated += count
+                else:
+                    batch_print(batch_dir, f"Warning: Failed to generate {category} tasks")
+        except BaseException:
+            abort_batches(pool)
+            raise
     
     if tasks_generated == 0:
         print("Error: No tasks were generated")
@@ -298,22 +439,29 @@ def main():
     print("-" * 40)
     
     all_results = []
-    
-    for i in range(2):
-        batch_dir = f"{OUTPUT_DIR}/batch-{i+1}"
-        if not Path(batch_dir).exists():
-            continue
-            
-        result = evaluate_tasks(
-            tasks_dir=batch_dir,
-            model=MODEL,
-            api_key=API_KEY,
-            max_steps=15,
-            timeout=180
-        )
-        
-        if result and "task_results" in result:
-            all_results.extend(result["task_results"])
+    batch_dirs = [f"{OUTPUT_DIR}/batch-{i+1}" for i in range(len(batch_categories))]
+    batch_dirs = [d for d in batch_dirs if Path(d).exists()]
+    
+    with ThreadPoolExecutor(max_workers=max(len(batch_dirs), 1)) as pool:
+        futures = [
+            pool.submit(
+                evaluate_tasks,
+                tasks_dir=batch_dir,
+                model=MODEL,
+                api_key=API_KEY,
+                max_steps=15,
+                timeout=180
+            )
+            for batch_dir in batch_dirs
+        ]
+        try:
+            for future in futures:
+                result = future.result()
+                if result and "task_results" in result:
+                    all_results.extend(result["task_results"])
+        except BaseException:
+            abort_batches(pool)
+            raise
     
     if not all_results:
         print("Warning: No evaluation results collected")
@@ -330,8 +478,8 @@ def main():
     
     # Save report
     report_path = f"{OUTPUT_DIR}/evaluation_report.json"
-    with open(report_path, "w") as f:
-        json.dump({
+    with open(report_path, "wb") as f:
+        f.write(json_dumps({
             "total_tasks": report.total_tasks,
             "successful_tasks": report.successful_tasks,
             "failed_tasks": report.failed_tasks,
@@ -340,7 +488,7 @@ def main():
             "by_difficulty": report.by_difficulty,
             "task_results": report.task_results,
             "recommendations": report.recommendations,
-        }, f, indent=2)
+        }))
     
     print(f"\n📁 Report saved to: {report_path}")
     